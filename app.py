@@ -1,17 +1,41 @@
+# gevent must monkey-patch the stdlib before httpx/openai/firecrawl import it.
+# Optional: without gevent the dev server still works, just one request at a time.
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+import asyncio
+import io
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlencode
 
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from dotenv import load_dotenv
 from firecrawl import FirecrawlApp
 from openai import OpenAI
 import markdown as md
+import mistune
+import tiktoken
 
 import httpx
 import trafilatura
+from cachetools import TTLCache
+
+# Background-job mode is optional (see README); the app must start without it.
+try:
+    import redis
+    from rq import Queue
+    from rq.job import Job
+except ImportError:
+    redis = None
+    Queue = Job = None
+from concurrent.futures import ThreadPoolExecutor
 
 # ---------- ENV ----------
 load_dotenv(dotenv_path=Path.cwd()/".env")
@@ -20,10 +44,63 @@ app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret")
 
 
+# ---------- API clients ----------
+# One client per process: constructing OpenAI()/FirecrawlApp() per request
+# builds a fresh connection pool + TLS context, so every call pays a full
+# TCP+TLS handshake instead of reusing a keepalive connection. Created lazily
+# so gevent monkey-patching and .env loading have already happened.
+_openai_client = None
+_fc_client = None
+
+def get_openai_client() -> OpenAI:
+    global _openai_client
+    if _openai_client is None:
+        key = os.getenv("OPENAI_API_KEY")
+        if not key:
+            raise RuntimeError("OPENAI_API_KEY missing in .env")
+        # HTTP/2 + keepalive pool: calls after the first reuse the TLS session
+        # instead of paying a fresh handshake and TCP slow start.
+        _openai_client = OpenAI(
+            api_key=key,
+            http_client=httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            ),
+        )
+    return _openai_client
+
+def get_firecrawl_client() -> FirecrawlApp:
+    global _fc_client
+    if _fc_client is None:
+        fc_key = os.getenv("FIRECRAWL_API_KEY")
+        if not fc_key:
+            raise RuntimeError("FIRECRAWL_API_KEY missing in .env")
+        _fc_client = FirecrawlApp(api_key=fc_key)
+    return _fc_client
+
+
 # ---------- Helpers ----------
+# Hot-path constants: compile/build once at import instead of per call.
+_SPLIT_RE = re.compile(r"[,\s]+")
+_SAFE_CHARS = frozenset("-_.")
+# Maps every unsafe ASCII codepoint to "_" so translate() sanitizes in one C pass;
+# the compiled pattern handles the (rare) non-ASCII names the same way.
+_FN_TABLE = {i: (chr(i) if chr(i).isalnum() or chr(i) in _SAFE_CHARS else "_") for i in range(128)}
+_UNSAFE_RE = re.compile(r"[^\w\-.]")
+_DASH_TRANS = str.maketrans({
+    "–": "-",  # en dash
+    "—": "-",  # em dash
+    "−": "-",  # minus sign
+})
+
 def sanitize_filename(name: str) -> str:
-    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name.strip()) or "report"
+    name = name.strip()
+    if name.isascii():
+        return name.translate(_FN_TABLE) or "report"
+    return _UNSAFE_RE.sub("_", name) or "report"
 
+@lru_cache(maxsize=256)
 def origin(url: str) -> str:
     try:
         u = urlparse(url)
@@ -33,10 +110,78 @@ def origin(url: str) -> str:
 
 def parse_urls_csv(s: str) -> List[str]:
     # Split by comma, newline, or whitespace
-    parts = re.split(r"[,\s]+", s.strip())
-    return [p for p in parts if p]
+    return [p for p in _SPLIT_RE.split(s.strip()) if p]
+
+def normalize_url(u: str) -> str:
+    # trim whitespace + smart quotes, then map unicode dashes to ASCII in one pass
+    return u.strip().strip("‘’“”\"'").translate(_DASH_TRANS)
+
+# Default seed URLs when the user supplies none, already normalized once at
+# import instead of rebuilt per request.
+_DEFAULT_URLS = tuple(map(normalize_url, (
+    "https://openai.com/blog",
+    "https://huggingface.co/blog",
+    "https://ai.googleblog.com/",
+    "https://www.deeplearning.ai/the-batch/",
+    "https://arxiv.org/list/cs.AI/recent",
+    "https://www.anthropic.com/news",
+)))
+
+_BAD_SCHEMES = frozenset({"file", "javascript", "data"})
+
+def dedupe_urls(urls: List[str]) -> List[str]:
+    """
+    Normalize and drop duplicates that differ only by trailing slash or host
+    case (each duplicate costs a Firecrawl row and a prompt slot). Order is
+    preserved; obviously-bad schemes are discarded.
+    """
+    seen: Dict[tuple, str] = {}
+    for u in urls:
+        nu = normalize_url(u)
+        if not nu:
+            continue
+        parsed = urlparse(nu)
+        if parsed.scheme in _BAD_SCHEMES:
+            continue
+        if not parsed.scheme:  # schemeless paste like "example.org/blog"
+            parsed = urlparse("https://" + nu)
+        key = (parsed.scheme, parsed.netloc.lower(), parsed.path.rstrip("/"), parsed.query)
+        seen.setdefault(key, nu)
+    return list(seen.values())
+
+# ---------- Markdown rendering ----------
+# mistune is several times faster than python-markdown on report-sized
+# documents (single parse vs stacked regex passes per extension). Set
+# MARKDOWN_RENDERER=python-markdown to fall back for rendering-parity checks.
+_mistune = mistune.create_markdown(plugins=["table", "strikethrough", "footnotes"])
+
+def render_markdown(text: str) -> str:
+    if os.getenv("MARKDOWN_RENDERER") == "python-markdown":
+        return md.markdown(text, extensions=["extra", "sane_lists"])
+    return _mistune(text)
+
+
+# ---------- Page cache ----------
+# Scraped pages keyed by URL. The default seed URLs are re-fetched on every
+# /research call otherwise — the biggest cost center (network + Firecrawl quota).
+# Entries keep whatever per_page_char_limit their first fetch used for the TTL;
+# callers asking for a larger limit get the shorter cached text.
+# For multi-process deployments swap this for diskcache/Redis.
+_page_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+
 
 # ---------- Firecrawl via extract ----------
+def _rows_of(res: Any) -> List[Dict[str, Any]]:
+    """Normalize a Firecrawl response (list, or dict keyed by data/results/result) into row dicts."""
+    if isinstance(res, list):
+        return [r if isinstance(r, dict) else {"url": str(r)} for r in res]
+    if isinstance(res, dict):
+        for k in ("data", "results", "result"):
+            v = res.get(k)
+            if isinstance(v, list):
+                return [r if isinstance(r, dict) else {} for r in v]
+    return []
+
 def firecrawl_fetch_pages_with_extract(
     topic: str,
     urls: List[str],
@@ -48,104 +193,175 @@ def firecrawl_fetch_pages_with_extract(
       2) if a row has no text, fall back to scrape(url)
     Returns [{url, title, text}, ...]
     """
-    fc_key = os.getenv("FIRECRAWL_API_KEY")
-    if not fc_key:
-        raise RuntimeError("FIRECRAWL_API_KEY missing in .env")
-
-    app_fc = FirecrawlApp(api_key=fc_key)
+    app_fc = get_firecrawl_client()
     if not urls:
         return []
 
-    # ---- 1) batch extract ----
-    try:
-        res = app_fc.extract(urls=urls)  # <-- no 'formats' kwarg on your version
-    except Exception as e:
-        print("extract() failed:", e)
-        res = None
+    # ---- 0) serve recently-scraped URLs from cache ----
+    cached = {u: _page_cache[u] for u in urls if u in _page_cache}
+    missing = [u for u in urls if u not in cached]
+    if not missing:
+        return [cached[u] for u in urls]
+
+    # ---- 1) batch extract, overlapped with trafilatura warmup ----
+    # If extract comes back empty we fall through to trafilatura; warming it
+    # during the (seconds-long) Firecrawl call makes that fallback free.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fc_future = pool.submit(app_fc.extract, urls=missing)  # <-- no 'formats' kwarg on your version
+        pool.submit(_trafilatura_warmup)
+        try:
+            res = fc_future.result()
+        except Exception as e:
+            print("extract() failed:", e)
+            res = None
 
     # normalize rows from extract
-    rows: List[Dict[str, Any]] = []
-    if isinstance(res, list):
-        rows = [r if isinstance(r, dict) else {"url": str(r)} for r in res]
-    elif isinstance(res, dict):
-        if isinstance(res.get("data"), list):
-            rows = [r if isinstance(r, dict) else {} for r in res["data"]]
-        elif isinstance(res.get("results"), list):
-            rows = [r if isinstance(r, dict) else {} for r in res["results"]]
-        elif isinstance(res.get("result"), list):
-            rows = [r if isinstance(r, dict) else {} for r in res["result"]]
-
-    items: List[Dict[str, str]] = []
-
-    def _append_if_text(url: str, title: str, text: str):
+    rows = _rows_of(res)
+
+    def _make_item(url: str, title: str, text: str):
         text = (text or "").strip()
         if url and text:
-            items.append({
+            truncated = text[:per_page_char_limit]
+            suffix = "…" if len(text) > per_page_char_limit else ""
+            return {
                 "url": url,
                 "title": (title or "").strip() or origin(url),
-                "text": text[: per_page_char_limit] + ("…" if len(text) > per_page_char_limit else "")
-            })
-            return True
-        return False
+                "text": truncated + suffix,
+            }
+        return None
+
+    # ---- collect from extract; queue per-URL scrapes for rows without text ----
+    results: List[Any] = [None] * len(rows)
+    pending: List[tuple] = []  # (index, url, title) rows needing a scrape fallback
 
-    # ---- collect from extract; fall back to scrape when needed ----
-    for row in rows:
+    for idx, row in enumerate(rows):
         url = (row.get("url") or row.get("sourceUrl") or row.get("link") or row.get("pageUrl") or "").strip()
         title = (row.get("title") or "").strip()
 
+        # Cap before any strip/copy: raw markdown/html fields can be MBs while
+        # we only ever keep per_page_char_limit chars.
         text = (
             row.get("markdown")
             or row.get("content")
             or row.get("text")
             or row.get("html")
             or ""
-        )
+        )[: per_page_char_limit * 2]
 
-        if _append_if_text(url, title, text):
-            continue
-
-        # Fallback to per-URL scrape
-        if url:
-            try:
-                s = app_fc.scrape(url)
-                d = s if isinstance(s, dict) else {}
-                data = d.get("data") if isinstance(d.get("data"), dict) else d
-                title2 = (data.get("title") or title or "").strip() if isinstance(data, dict) else title
-                text2 = ""
-                if isinstance(data, dict):
-                    text2 = (
-                        data.get("content")
-                        or data.get("markdown")
-                        or data.get("text")
-                        or data.get("html")
-                        or ""
-                    )
-                if _append_if_text(url, title2, text2):
-                    continue
-                else:
-                    print(f"[skip] No text from extract/scrape for {url}")
-            except Exception as e:
-                print(f"[skip] scrape failed for {url}: {e}")
+        item = _make_item(url, title, text)
+        if item:
+            results[idx] = item
+        elif url:
+            pending.append((idx, url, title))
         else:
             print("[skip] row without URL in extract response")
 
-    return items
+    # Raw extract payloads can dwarf the truncated items; release them before
+    # the fallback scrapes pile more text on the heap.
+    del rows
+
+    # ---- scrape fallbacks in parallel; pure I/O, so threads give ~N× speedup ----
+    def _scrape_fallback(url: str, title: str):
+        try:
+            s = app_fc.scrape(url)
+            d = s if isinstance(s, dict) else {}
+            data = d.get("data") if isinstance(d.get("data"), dict) else d
+            title2 = (data.get("title") or title or "").strip() if isinstance(data, dict) else title
+            text2 = ""
+            if isinstance(data, dict):
+                # Same early cap as the extract rows: never copy more than we keep.
+                text2 = (
+                    data.get("content")
+                    or data.get("markdown")
+                    or data.get("text")
+                    or data.get("html")
+                    or ""
+                )[: per_page_char_limit * 2]
+            item = _make_item(url, title2, text2)
+            if not item:
+                print(f"[skip] No text from extract/scrape for {url}")
+            return item
+        except Exception as e:
+            print(f"[skip] scrape failed for {url}: {e}")
+            return None
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(16, len(pending))) as ex:
+            scraped = ex.map(lambda p: _scrape_fallback(p[1], p[2]), pending)
+            # Fill results back by index so citation numbering stays in input order.
+            for (idx, _, _), item in zip(pending, scraped):
+                results[idx] = item
+
+    by_url = dict(cached)
+    fresh = []
+    # Key the cache on the URL we were asked for — Firecrawl may report a
+    # canonicalized/redirected URL that would never match a later lookup. The
+    # positional pairing with missing[] only holds when we got exactly one row
+    # per requested URL; if rows were dropped, every later index shifts and we
+    # would cache the wrong page under a URL for the full TTL, so fall back to
+    # the reported URL alone.
+    aligned = len(results) == len(missing)
+    for idx, item in enumerate(results):
+        if not item:
+            continue
+        fresh.append(item)
+        requested = missing[idx] if aligned else item["url"]
+        _page_cache[requested] = item
+        by_url.setdefault(requested, item)
+        if item["url"] != requested:
+            _page_cache[item["url"]] = item
+            by_url.setdefault(item["url"], item)
+
+    # Reassemble in input order; rows whose URL changed (redirects) go last.
+    ordered = [by_url[u] for u in urls if u in by_url]
+    placed = {id(it) for it in ordered}
+    ordered.extend(it for it in fresh if id(it) not in placed)
+    return ordered
 
 
 # ---------- OpenAI synth ----------
-def enhance_with_openai(topic: str, items: List[Dict[str, str]]) -> str:
-    key = os.getenv("OPENAI_API_KEY")
-    if not key:
-        raise RuntimeError("OPENAI_API_KEY missing in .env")
+class NoCorpusError(RuntimeError):
+    """Raised instead of paying an OpenAI round trip for an empty corpus."""
 
-    client = OpenAI(api_key=key)
+_tt_encoder = None
 
-    corpus_lines = []
+def _get_encoder():
+    global _tt_encoder
+    if _tt_encoder is None:
+        try:
+            _tt_encoder = tiktoken.encoding_for_model("gpt-4.1-mini")
+        except KeyError:
+            _tt_encoder = tiktoken.get_encoding("o200k_base")
+    return _tt_encoder
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    enc = _get_encoder()
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
+
+def build_research_prompt(topic: str, items: List[Dict[str, str]]) -> str:
+    # Per-source token budget keeps total prompt length (and OpenAI latency,
+    # which scales with prompt tokens) predictable regardless of page size.
+    max_tokens_per_page = int(os.getenv("MAX_TOKENS_PER_PAGE", "2000"))
+
+    # StringIO avoids the final join copy when the corpus is large; skip
+    # empty rows before touching title/origin at all.
+    buf = io.StringIO()
     for i, it in enumerate(items, 1):
-        url = it.get("url",""); title = it.get("title","") or origin(url); text = it.get("text","")
-        if url and text:
-            corpus_lines.append(f"[{i}] {title} — {url}\n{text}\n")
-    corpus = "\n".join(corpus_lines) if corpus_lines else "No pages scraped."
+        url = it.get("url"); text = it.get("text")
+        # Sources with only a trivial snippet waste a citation slot.
+        if not (url and text) or len(text) <= 200:
+            continue
+        title = it.get("title") or origin(url)
+        text = truncate_to_tokens(text, max_tokens_per_page)
+        buf.write(f"[{i}] {title} — {url}\n")
+        buf.write(text)
+        buf.write("\n\n")
+    corpus = buf.getvalue()
+    if not corpus:
+        raise NoCorpusError("No usable content extracted from any source.")
 
     prompt = f"""
 You are an expert research writer.
@@ -164,23 +380,102 @@ TASK:
 
 Keep it factual, concise, and readable. If any claims are speculative, mark them as such.
 """
-    resp = client.responses.create(model="gpt-4.1-mini", input=prompt)
+    return prompt
+
+def _synth_params(model: str = "", max_output_tokens: int = 0):
+    # Output tokens dominate latency, so capping them bounds total time.
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    max_output_tokens = max_output_tokens or int(os.getenv("MAX_OUTPUT_TOKENS", "1500"))
+    return model, max_output_tokens
+
+def enhance_with_openai(topic: str, items: List[Dict[str, str]],
+                        model: str = "", max_output_tokens: int = 0) -> str:
+    client = get_openai_client()
+    model, max_output_tokens = _synth_params(model, max_output_tokens)
+    prompt = build_research_prompt(topic, items)
+    resp = client.responses.create(model=model, input=prompt,
+                                   max_output_tokens=max_output_tokens)
     return resp.output_text
 
+def stream_with_openai(topic: str, items: List[Dict[str, str]],
+                       model: str = "", max_output_tokens: int = 0):
+    """
+    Same synthesis as enhance_with_openai, but yields markdown chunks as the
+    model generates them instead of blocking on the full response.
+    """
+    client = get_openai_client()
+    model, max_output_tokens = _synth_params(model, max_output_tokens)
+    prompt = build_research_prompt(topic, items)
+    with client.responses.stream(model=model, input=prompt,
+                                 max_output_tokens=max_output_tokens) as stream:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                yield event.delta
+
 # ---------- Direct fetch + trafilatura (not used in main flow) ----------
+_trafilatura_warmed = False
+
+def _trafilatura_warmup():
+    """
+    trafilatura lazy-loads its extraction machinery on first use; run a tiny
+    extract once per process so the fallback path doesn't pay the cold start.
+    """
+    global _trafilatura_warmed
+    if _trafilatura_warmed:
+        return
+    try:
+        trafilatura.extract("<html><body><p>warmup</p></body></html>")
+    except Exception:
+        pass
+    _trafilatura_warmed = True
+
+async def _afetch_all(urls: List[str]) -> List[Any]:
+    """
+    Download all URLs concurrently with httpx. HTTP/2 multiplexes requests to
+    the same host; the semaphore caps total in-flight connections.
+    """
+    sem = asyncio.Semaphore(8)
+    async with httpx.AsyncClient(
+        http2=True,
+        timeout=15,
+        follow_redirects=True,
+        headers={"User-Agent": "Mozilla/5.0 (compatible; flask-research-ai)"},
+    ) as client:
+        async def _get(u: str):
+            async with sem:
+                return await client.get(u)
+        return await asyncio.gather(*[_get(u) for u in urls], return_exceptions=True)
+
 def direct_fetch_pages_with_trafilatura(
     urls: List[str],
     per_page_char_limit: int = 8000,
 ) -> List[Dict[str, str]]:
     """
     Fetch pages directly (no Firecrawl) and extract main content with trafilatura.
-    Uses trafilatura.fetch_url() which handles redirects, headers, gzip, etc.
+    Downloads run concurrently via httpx (trafilatura.fetch_url is serial urllib3);
+    extraction then happens in-process, in input order.
     """
-    items: List[Dict[str, str]] = []
+    if not urls:
+        return []
 
-    for url in urls:
+    cached = {u: _page_cache[u] for u in urls if u in _page_cache}
+    missing = [u for u in urls if u not in cached]
+    if not missing:
+        return [cached[u] for u in urls]
+
+    responses = asyncio.run(_afetch_all(missing))
+
+    for url, resp in zip(missing, responses):
         try:
-            downloaded = trafilatura.fetch_url(url)
+            if isinstance(resp, Exception):
+                print(f"[direct] fetch failed for {url}: {resp}")
+                continue
+            # trafilatura.fetch_url silently dropped non-2xx pages; keep that
+            # behavior so 404/500 boilerplate never becomes a citation.
+            if not resp.is_success:
+                print(f"[direct] fetch failed for {url}: HTTP {resp.status_code}")
+                continue
+            downloaded = resp.text
             if not downloaded:
                 print(f"[direct] fetch failed or empty for {url}")
                 continue
@@ -190,7 +485,7 @@ def direct_fetch_pages_with_trafilatura(
                 include_comments=False,
                 include_tables=False,
                 with_metadata=True,
-                url=url,  # help trafilatura with canonical/metadata
+                url=str(resp.url),  # post-redirect URL helps trafilatura with canonical/metadata
                 no_fallback=False,
             )
             if not text:
@@ -211,19 +506,65 @@ def direct_fetch_pages_with_trafilatura(
                     title = title.strip()
 
             if text:
-                items.append({
+                truncated = text[:per_page_char_limit]
+                suffix = "…" if len(text) > per_page_char_limit else ""
+                item = {
                     "url": url,
                     "title": title or origin(url),
-                    "text": text[:per_page_char_limit] + ("…" if len(text) > per_page_char_limit else ""),
-                })
+                    "text": truncated + suffix,
+                }
+                _page_cache[url] = item
+                cached[url] = item
         except Exception as e:
             print(f"[direct] failed for {url}: {e}")
 
-    return items
+    return [cached[u] for u in urls if u in cached]
+
 
 
+# ---------- Background jobs ----------
+# Optional job-queue mode: POST enqueues, the browser polls /status/<id>.
+# Keeps long research runs off the HTTP request entirely and lets workers
+# scale separately from web frontends. Needs Redis + `rq worker research`.
+_redis_conn = None
+_rq_queue = None
+
+def get_queue() -> Queue:
+    global _redis_conn, _rq_queue
+    if redis is None:
+        raise RuntimeError("Background mode needs rq and redis: pip install rq redis")
+    if _rq_queue is None:
+        _redis_conn = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        _rq_queue = Queue("research", connection=_redis_conn)
+    return _rq_queue
+
+def run_research(topic: str, urls: List[str], per_page_limit: int,
+                 model: str = "", max_output_tokens: int = 0) -> Dict[str, str]:
+    """RQ worker entry point: full scrape + synthesis, returns the report."""
+    items = collect_items(topic, urls, per_page_limit)
+    if not items:
+        raise NoCorpusError("Could not scrape any content. Try different article URLs.")
+    report_md = "## Enhanced Research Report\n\n" + enhance_with_openai(
+        topic, items, model=model, max_output_tokens=max_output_tokens)
+    return {"topic": topic, "report_md": report_md, "report_html": render_markdown(report_md)}
+
 
 # ---------- Routes ----------
+def collect_items(topic: str, urls: List[str], per_page_limit: int) -> List[Dict[str, str]]:
+    # Fetch pages (Firecrawl first)
+    items = firecrawl_fetch_pages_with_extract(topic, urls, per_page_char_limit=per_page_limit)
+
+    # Fallback to local extractor if Firecrawl returns nothing
+    if not items:
+        print("→ Firecrawl returned no content; falling back to local extractor (trafilatura)…")
+        items = direct_fetch_pages_with_trafilatura(urls, per_page_char_limit=per_page_limit)
+
+    return items
+
+def sse_format(data: str) -> str:
+    # Multi-line payloads need one "data:" line each; EventSource re-joins them.
+    return "".join(f"data: {line}\n" for line in data.split("\n")) + "\n"
+
 @app.get("/")
 def index():
     return render_template("index.html")
@@ -234,53 +575,121 @@ def research():
     urls_csv = request.form.get("urls","").strip()
     max_urls = int(request.form.get("max_urls","8") or "8")
     per_page_limit = int(request.form.get("per_page_limit","8000") or "8000")
+    model = request.form.get("model","").strip()
+    max_output_tokens = int(request.form.get("max_output_tokens","0") or "0")
+    # Streaming is the default; pass stream=0 for the old blocking full-document response.
+    streaming = (request.form.get("stream") or request.args.get("stream") or "1") != "0"
 
     if not topic:
         flash("Please enter a topic.")
         return redirect(url_for("index"))
 
-    urls_override = parse_urls_csv(urls_csv)
-    urls_override = [normalize_url(u) for u in parse_urls_csv(urls_csv)]
+    urls_override = dedupe_urls(parse_urls_csv(urls_csv))
 
     # If user gave no URLs, fallback to defaults
-    urls = urls_override[:max_urls] if urls_override else [
-        "https://openai.com/blog",
-        "https://huggingface.co/blog",
-        "https://ai.googleblog.com/",
-        "https://www.deeplearning.ai/the-batch/",
-        "https://arxiv.org/list/cs.AI/recent",
-        "https://www.anthropic.com/news",
-    ][:max_urls]
+    urls = (urls_override or list(_DEFAULT_URLS))[:max_urls]
 
     print("Normalized URLs:", urls)
 
-    # Fetch pages (Firecrawl first)
-    items = firecrawl_fetch_pages_with_extract(topic, urls, per_page_char_limit=per_page_limit)
-
-    # Fallback to local extractor if Firecrawl returns nothing
-    if not items:
-        print("→ Firecrawl returned no content; falling back to local extractor (trafilatura)…")
-        items = direct_fetch_pages_with_trafilatura(urls, per_page_char_limit=per_page_limit)
+    if request.form.get("background") == "1":
+        try:
+            job = get_queue().enqueue(run_research, topic, urls, per_page_limit,
+                                      model, max_output_tokens, job_timeout=600)
+        except RuntimeError as e:
+            flash(str(e))
+            return redirect(url_for("index"))
+        return render_template("pending.html", topic=topic, job_id=job.id)
+
+    if streaming:
+        # Render the shell immediately; the page opens an EventSource on /research/stream.
+        stream_qs = urlencode({
+            "topic": topic,
+            "urls": ",".join(urls),
+            "per_page_limit": per_page_limit,
+            "model": model,
+            "max_output_tokens": max_output_tokens,
+        })
+        return render_template("result.html", topic=topic, streaming=True, stream_qs=stream_qs)
+
+    items = collect_items(topic, urls, per_page_limit)
 
     if not items:
         flash("Could not scrape any content. Try different article URLs.")
         return redirect(url_for("index"))
 
 
-    report_md = "## Enhanced Research Report\n\n" + enhance_with_openai(topic, items)
-    report_html = md.markdown(report_md, extensions=["extra","sane_lists"])
-    return render_template("result.html", topic=topic, report_html=report_html, report_md=report_md)
+    try:
+        report_md = "## Enhanced Research Report\n\n" + enhance_with_openai(
+            topic, items, model=model, max_output_tokens=max_output_tokens)
+    except NoCorpusError:
+        flash("No usable content extracted. Try different article URLs.")
+        return redirect(url_for("index"))
+    report_html = render_markdown(report_md)
+    return render_template("result.html", topic=topic, streaming=False, report_html=report_html, report_md=report_md)
+
+@app.get("/research/stream")
+def research_stream():
+    topic = request.args.get("topic","").strip()
+    urls = parse_urls_csv(request.args.get("urls",""))
+    per_page_limit = int(request.args.get("per_page_limit","8000") or "8000")
+    model = request.args.get("model","").strip()
+    max_output_tokens = int(request.args.get("max_output_tokens","0") or "0")
+    # Batch-growth knobs: first frame flushes immediately (low TTFT), later
+    # deltas are coalesced to cut per-frame SSE framing overhead.
+    min_batch_size = int(request.args.get("min_batch_size","1") or "1")
+    max_batch_size = int(request.args.get("max_batch_size","50") or "50")
+    growth_factor = float(request.args.get("growth_factor","3") or "3")
+
+    def generate():
+        # No pacing sleeps here, ever: a "typing effect" time.sleep() per chunk
+        # adds N_chunks x delay of artificial latency. Chunks go out as fast as
+        # the model produces them; flushing is the server's job.
+        if not topic:
+            yield "event: error\ndata: Missing topic.\n\n"
+            return
+        try:
+            items = collect_items(topic, urls, per_page_limit)
+            if not items:
+                yield "event: error\ndata: Could not scrape any content. Try different article URLs.\n\n"
+                return
+            yield sse_format("## Enhanced Research Report\n\n")
+            buf: List[str] = []
+            size = max(1, min_batch_size)
+            for chunk in stream_with_openai(topic, items, model=model,
+                                            max_output_tokens=max_output_tokens):
+                buf.append(chunk)
+                if len(buf) >= size:
+                    yield sse_format("".join(buf))
+                    buf.clear()
+                    size = max(1, min(max_batch_size, int(size * growth_factor)))
+            if buf:
+                yield sse_format("".join(buf))
+            yield "event: done\ndata: \n\n"
+        except NoCorpusError:
+            yield "event: error\ndata: No usable content extracted. Try different article URLs.\n\n"
+        except Exception as e:
+            print("stream failed:", e)
+            # Exception text can span lines; sse_format keeps every line
+            # "data:"-prefixed so EventSource doesn't drop the payload.
+            yield "event: error\n" + sse_format(f"Report generation failed: {e}")
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream")
+
+@app.get("/status/<job_id>")
+def job_status(job_id):
+    try:
+        job = Job.fetch(job_id, connection=get_queue().connection)
+    except Exception:
+        return jsonify({"status": "unknown"}), 404
+
+    status = job.get_status()
+    payload: Dict[str, Any] = {"status": status}
+    if status == "finished":
+        payload.update(job.result)
+    elif status == "failed":
+        payload["error"] = (job.exc_info or "").strip().split("\n")[-1]
+    return jsonify(payload)
 
-def normalize_url(u: str) -> str:
-    # trim whitespace + smart quotes
-    s = u.strip().strip("‘’“”\"'")
-    # replace common unicode dashes with ASCII hyphen
-    s = (s
-         .replace("\u2013", "-")   # en dash
-         .replace("\u2014", "-")   # em dash
-         .replace("\u2212", "-")   # minus sign
-        )
-    return s
 
 
 if __name__ == "__main__":